@@ -28,97 +28,165 @@
 # THE SOFTWARE.
 #
 
+import functools
 import os
 import re
+import shutil
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
 
 
 # ─── .env Loader ───────────────────────────────────────────────────────────────
 
+# Matches KEY=value lines with surrounding whitespace already trimmed;
+# comments and blank lines simply never match.
+_ENV_RE = re.compile(r"(?m)^[ \t]*(?!#)([A-Z_][A-Z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t]*$")
+
+
 def load_env(env_path: str) -> dict:
     """Parse a .env file and return a dict of key=value pairs."""
-    env_vars = {}
     if not os.path.isfile(env_path):
         print(f"Warning: .env file not found at {env_path}")
         print("Copy .env.example to .env and fill in your values.")
         sys.exit(1)
     with open(env_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            if "=" in line:
-                key, value = line.split("=", 1)
-                env_vars[key.strip()] = value.strip()
-    return env_vars
+        return dict(_ENV_RE.findall(f.read()))
 
 
 # ─── Description Generator ─────────────────────────────────────────────────────
 
-# Maps common filename patterns / directory hints to human-readable descriptions
-DESCRIPTION_RULES: list[tuple[str, str]] = [
+# Maps common filename patterns / directory hints to human-readable descriptions.
+# Keys double as named-group names in the fused regex below, so they must be
+# valid Python identifiers and unique.
+_PATTERNS: list[tuple[str, str]] = [
     # Vue components
-    (r"views?[/\\]", "Vue view component for the {name} page."),
-    (r"layouts?[/\\]", "Vue layout component for {name}."),
-    (r"components?[/\\]", "Vue component for {name}."),
-    (r"pages?[/\\]", "Page component for {name}."),
-    (r"composables?[/\\]", "Vue composable providing {name} logic."),
+    ("views", r"views?[/\\]"),
+    ("layouts", r"layouts?[/\\]"),
+    ("components", r"components?[/\\]"),
+    ("pages", r"pages?[/\\]"),
+    ("composables", r"composables?[/\\]"),
     # State / store
-    (r"stores?[/\\]", "Pinia/Vuex store module for {name}."),
+    ("stores", r"stores?[/\\]"),
     # Routing
-    (r"router", "Application routing configuration."),
+    ("router", r"router"),
     # Services / API
-    (r"services?[/\\]", "Service layer handling {name} operations."),
-    (r"api[/\\]", "API client for {name} endpoints."),
+    ("services", r"services?[/\\]"),
+    ("api", r"api[/\\]"),
     # Utils / helpers
-    (r"utils?[/\\]", "Utility functions for {name}."),
-    (r"helpers?[/\\]", "Helper functions for {name}."),
+    ("utils", r"utils?[/\\]"),
+    ("helpers", r"helpers?[/\\]"),
     # Types / interfaces
-    (r"types?[/\\]", "TypeScript type definitions for {name}."),
-    (r"interfaces?[/\\]", "TypeScript interfaces for {name}."),
-    (r"models?[/\\]", "Data model definitions for {name}."),
+    ("types", r"types?[/\\]"),
+    ("interfaces", r"interfaces?[/\\]"),
+    ("models", r"models?[/\\]"),
     # Middleware
-    (r"middlewares?[/\\]", "Middleware for {name}."),
+    ("middlewares", r"middlewares?[/\\]"),
     # Plugins
-    (r"plugins?[/\\]", "Plugin configuration for {name}."),
+    ("plugins", r"plugins?[/\\]"),
     # Config
-    (r"config", "Configuration file for {name}."),
+    ("config", r"config"),
     # Tests
-    (r"(__tests__|tests?|spec)[/\\]", "Test suite for {name}."),
+    ("tests", r"(?:__tests__|tests?|spec)[/\\]"),
 ]
 
-
-def generate_description(file_path: str) -> str:
-    """Generate a human-readable description based on filename and path."""
+_RULE_TABLE: dict[str, str] = {
+    "views": "Vue view component for the {name} page.",
+    "layouts": "Vue layout component for {name}.",
+    "components": "Vue component for {name}.",
+    "pages": "Page component for {name}.",
+    "composables": "Vue composable providing {name} logic.",
+    "stores": "Pinia/Vuex store module for {name}.",
+    "router": "Application routing configuration.",
+    "services": "Service layer handling {name} operations.",
+    "api": "API client for {name} endpoints.",
+    "utils": "Utility functions for {name}.",
+    "helpers": "Helper functions for {name}.",
+    "types": "TypeScript type definitions for {name}.",
+    "interfaces": "TypeScript interfaces for {name}.",
+    "models": "Data model definitions for {name}.",
+    "middlewares": "Middleware for {name}.",
+    "plugins": "Plugin configuration for {name}.",
+    "config": "Configuration file for {name}.",
+    "tests": "Test suite for {name}.",
+}
+
+# All rules fused into a single alternation: one regex pass per path instead
+# of one search per rule, dispatched on the matched group name.
+_FUSED = re.compile(
+    "|".join(f"(?P<{key}>{pattern})" for key, pattern in _PATTERNS), re.IGNORECASE
+)
+_SEP_RE = re.compile(r"[-_]")
+_CAMEL_RE = re.compile(r"([a-z])([A-Z])")
+
+# Paths are normalised to forward slashes once, when collected, rather than
+# per description lookup. On POSIX this is the identity.
+if os.sep == "/":
+    def _norm(path: str) -> str:
+        return path
+else:
+    def _norm(path: str) -> str:
+        return path.replace(os.sep, "/")
+
+
+@functools.lru_cache(maxsize=2048)
+def _stem_to_readable(stem: str) -> str:
+    """Turn a camelCase/kebab-case/snake_case stem into readable words.
+
+    Cached: stems like index, types or utils recur across directories, so
+    most lookups skip the two regex substitutions.
+    """
+    return _CAMEL_RE.sub(r"\1 \2", _SEP_RE.sub(" ", stem)).strip()
+
+
+@functools.lru_cache(maxsize=4096)
+def _classify_dir(dirpath: str) -> str | None:
+    """Return the description template matching *dirpath*, or None.
+
+    Every file in a directory hits the same rule, so the regex runs once
+    per directory instead of once per file. The rule patterns accept both
+    separators, so unnormalised input still classifies correctly.
+    """
+    m = _FUSED.search(dirpath + "/")
+    return _RULE_TABLE[m.lastgroup] if m else None
+
+
+def generate_description(file_path: str, ext: str | None = None) -> str:
+    """Generate a human-readable description based on filename and path.
+
+    *ext* may be supplied by callers that already split the path, to avoid
+    a redundant splitext.
+    """
     basename = os.path.basename(file_path)
-    name_without_ext = os.path.splitext(basename)[0]
+    name_without_ext, split_ext = os.path.splitext(basename)
+    if ext is None:
+        ext = split_ext
 
     # Convert camelCase / PascalCase / kebab-case / snake_case to readable words
-    readable = re.sub(r"[-_]", " ", name_without_ext)
-    readable = re.sub(r"([a-z])([A-Z])", r"\1 \2", readable)
-    readable = readable.strip()
+    readable = _stem_to_readable(name_without_ext)
 
     # Special filenames
     lower = basename.lower()
     if lower in ("index.ts", "index.vue", "index.js"):
         parent = os.path.basename(os.path.dirname(file_path))
-        readable = re.sub(r"[-_]", " ", parent)
-        readable = re.sub(r"([a-z])([A-Z])", r"\1 \2", readable).strip()
+        readable = _stem_to_readable(parent)
         return f"Entry point for the {readable} module."
     if lower.startswith("main.") or lower.startswith("app."):
         return "Application entry point."
 
-    # Try to match a directory-based rule
-    normalised = file_path.replace("\\", "/")
-    for pattern, template in DESCRIPTION_RULES:
-        if re.search(pattern, normalised, re.IGNORECASE):
-            return template.format(name=readable)
+    # Try to match a directory-based rule (cached per directory)
+    template = _classify_dir(os.path.dirname(file_path))
+    if template is None:
+        # Rules without a trailing separator (router, config) can also match
+        # on the filename itself, e.g. "src/router.ts".
+        m = _FUSED.search(basename)
+        if m:
+            template = _RULE_TABLE[m.lastgroup]
+    if template is not None:
+        return template.format(name=readable)
 
     # Fallback: generic but still uses the readable name
-    ext = os.path.splitext(basename)[1]
     if ext == ".vue":
         return f"Vue component for {readable}."
     if ext in (".ts", ".tsx"):
@@ -133,90 +201,210 @@ def generate_description(file_path: str) -> str:
 class HeaderManager:
     """Loads header templates from JSON and resolves placeholders per file."""
 
+    _PH_RE = re.compile(r"\{\{(FILE_NAME|DESCRIPTION)\}\}")
+    _STATIC_PH_RE = re.compile(r"\{\{(AUTHOR|YEAR|COMPANY)\}\}")
+
     def __init__(self, json_path: str, env_vars: dict):
         with open(json_path, "r", encoding="utf-8") as f:
             self.templates = json.load(f)
         self.author = env_vars.get("HEADER_AUTHOR", "")
         self.company = env_vars.get("HEADER_COMPANY", "")
         self.year = env_vars.get("HEADER_YEAR", "") or str(datetime.now().year)
+        # Drop empty entries (e.g. a trailing comma): an empty suffix would
+        # make the endswith tuple match every file in the tree.
         self.extensions = [
-            e.strip() for e in env_vars.get("HEADER_EXTENSIONS", ".ts,.vue").split(",")
+            e.strip()
+            for e in env_vars.get("HEADER_EXTENSIONS", ".ts,.vue").split(",")
+            if e.strip()
         ]
         self.exclude_dirs = [
             d.strip()
             for d in env_vars.get("HEADER_EXCLUDE_DIRS", "node_modules,.git").split(",")
         ]
+        # Immutable lookup structures for the walk hot path: one C-level
+        # suffix check per filename, one O(1) membership test per directory.
+        self._ext_tuple = tuple(self.extensions)
+        self._exclude_set = frozenset(self.exclude_dirs)
+        # AUTHOR/YEAR/COMPANY never change within a run: join the template
+        # lines and bake the static placeholders in once, so only FILE_NAME
+        # and DESCRIPTION remain to resolve per file.
+        static = {"AUTHOR": self.author, "YEAR": self.year, "COMPANY": self.company}
+        self._prepared = {
+            key: self._STATIC_PH_RE.sub(
+                lambda m: static[m.group(1)], "\n".join(lines) + "\n"
+            )
+            for key, lines in self.templates.items()
+        }
+        # Prepared templates are split on their placeholders lazily, on
+        # first render: even indices are literal runs, odd indices are
+        # placeholder names. A rerun over an already-headered tree can
+        # finish without ever splitting the header templates.
+        self._segments: dict[str, list[str]] = {}
+        # The rendered check-prefix can be shared between files when its
+        # template doesn't reference per-file placeholders; note which ones
+        # it uses so _render_is_header can pick the widest safe cache key.
+        self._is_header_cache: dict = {}
+        self._is_header_needs = {}
+        for key in ("isHeader", "isVueHeader"):
+            text = self._prepared.get(key, "")
+            self._is_header_needs[key] = (
+                "{{FILE_NAME}}" in text,
+                "{{DESCRIPTION}}" in text,
+            )
 
     # ── placeholder resolution ──────────────────────────────────────────────
 
-    def _resolve(self, lines: list[str], file_path: str) -> str:
-        """Replace {{PLACEHOLDERS}} in a list of header lines and return a string."""
+    def _segments_for(self, key: str) -> list[str]:
+        """Return the placeholder-split segments for *key*, splitting lazily."""
+        segments = self._segments.get(key)
+        if segments is None:
+            segments = self._segments[key] = self._PH_RE.split(self._prepared[key])
+        return segments
+
+    def _fill(self, key: str, filename: str, description: str) -> str:
+        """Render the template *key* by joining its precomputed segments."""
+        mapping = {"FILE_NAME": filename, "DESCRIPTION": description}
+        return "".join(
+            mapping[seg] if i & 1 else seg
+            for i, seg in enumerate(self._segments_for(key))
+        )
+
+    def _resolve_write(
+        self, out, key: str, filename: str, description: str
+    ) -> None:
+        """Write the rendered template *key* straight to the binary file *out*.
+
+        Streams literal runs and placeholder values chunk by chunk, never
+        building the full header string in memory.
+        """
+        mapping = {"FILE_NAME": filename, "DESCRIPTION": description}
+        for i, seg in enumerate(self._segments_for(key)):
+            out.write((mapping[seg] if i & 1 else seg).encode("utf-8"))
+
+    def _resolve(self, key: str, file_path: str) -> str:
         filename = os.path.basename(file_path)
-        description = generate_description(file_path)
-        text = "\n".join(lines) + "\n"
-        text = text.replace("{{FILE_NAME}}", filename)
-        text = text.replace("{{AUTHOR}}", self.author)
-        text = text.replace("{{YEAR}}", self.year)
-        text = text.replace("{{COMPANY}}", self.company)
-        text = text.replace("{{DESCRIPTION}}", description)
-        return text
+        return self._fill(key, filename, generate_description(file_path))
+
+    def _render_is_header(self, key: str, filename: str, description: str) -> str:
+        """Render the check-prefix, memoized as widely as its template allows."""
+        uses_name, uses_desc = self._is_header_needs[key]
+        if uses_name:
+            # Unique per file; nothing to share.
+            return self._fill(key, filename, description)
+        # Descriptions embed the per-file stem, so they aren't constant even
+        # within one directory: the only safe shared key is the description
+        # text itself (or the bare template key when nothing varies).
+        cache_key = (key, description) if uses_desc else key
+        cached = self._is_header_cache.get(cache_key)
+        if cached is None:
+            cached = self._fill(key, filename, description)
+            self._is_header_cache[cache_key] = cached
+        return cached
 
     def get_header(self, file_path: str) -> str:
         ext = os.path.splitext(file_path)[1]
         key = "vueHeader" if ext == ".vue" else "header"
-        return self._resolve(self.templates[key], file_path)
+        return self._resolve(key, file_path)
 
     def get_is_header(self, file_path: str) -> str:
         """Return the check-prefix used to detect an existing header."""
         ext = os.path.splitext(file_path)[1]
         key = "isVueHeader" if ext == ".vue" else "isHeader"
-        return self._resolve(self.templates[key], file_path)
+        return self._resolve(key, file_path)
 
     # ── file processing ─────────────────────────────────────────────────────
 
-    def _already_has_header(self, content: str, file_path: str) -> bool:
-        """Check if the file already starts with a header comment block."""
-        is_header = self.get_is_header(file_path)
-        if content.startswith(is_header):
-            return True
-        # Also match existing headers with different metadata (e.g. old author)
-        ext = os.path.splitext(file_path)[1]
-        if ext == ".vue":
-            return content.startswith("<!--\n/**\nFile Name:")
-        return content.startswith("/*\nFile Name:")
+    # Bytes to read when checking for an existing header; comfortably longer
+    # than any check-prefix the templates produce.
+    _PREFIX_LEN = 256
+
+    # Legacy header openings (different metadata, e.g. an old author) that
+    # should also count as "already has a header".
+    _VUE_LEGACY_PREFIX = b"<!--\n/**\nFile Name:"
+    _PLAIN_LEGACY_PREFIX = b"/*\nFile Name:"
+
+    @staticmethod
+    def _read_prefix(file_path: str, length: int) -> bytes:
+        """Read the first *length* bytes via raw os calls.
+
+        Skips the BufferedReader/TextIOWrapper setup that open() pays for,
+        which is pure overhead for a single short read.
+        """
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            return os.read(fd, length)
+        finally:
+            os.close(fd)
 
     def add_header(self, file_path: str) -> None:
         """Add a header to a file if it doesn't already have one."""
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        if self._already_has_header(content, file_path):
-            print(f"  [skip] {file_path}")
+        # Only the first few bytes decide the (common) skip case; avoid
+        # reading whole files just to leave them untouched.
+        ext = os.path.splitext(file_path)[1]
+        prefix = self._read_prefix(file_path, self._PREFIX_LEN)
+        # Cheap check first: a literal byte compare against the known header
+        # opening. On a rerun over an already-headered tree this skips the
+        # file before any description or template work happens.
+        legacy = self._VUE_LEGACY_PREFIX if ext == ".vue" else self._PLAIN_LEGACY_PREFIX
+        if prefix.startswith(legacy):
+            print(f"  [skip] {file_path}\n", end="")
+            return
+        if ext == ".vue":
+            header_key, is_header_key = "vueHeader", "isVueHeader"
+        else:
+            header_key, is_header_key = "header", "isHeader"
+        filename = os.path.basename(file_path)
+        description = generate_description(file_path, ext)
+        is_header = self._render_is_header(is_header_key, filename, description)
+        if prefix.startswith(is_header.encode("utf-8")):
+            print(f"  [skip] {file_path}\n", end="")
             return
-        header = self.get_header(file_path)
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(header)
-            f.write(content)
-        print(f"  [added] {file_path}")
+        # Write header + original content to a sibling tempfile and swap it
+        # in with os.replace: peak memory stays at one copy chunk and a
+        # crash mid-write can't leave a truncated original behind.
+        tmp_path = file_path + ".hdr.tmp"
+        try:
+            with open(tmp_path, "wb") as out:
+                self._resolve_write(out, header_key, filename, description)
+                with open(file_path, "rb") as src:
+                    shutil.copyfileobj(src, out, length=65536)
+            # The tempfile is created with umask defaults; carry over the
+            # original mode (e.g. executable bits) before swapping it in.
+            shutil.copymode(file_path, tmp_path)
+            os.replace(tmp_path, file_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        print(f"  [added] {file_path}\n", end="")
 
     # ── directory walking ───────────────────────────────────────────────────
 
-    def should_exclude(self, dirpath: str) -> bool:
-        parts = Path(dirpath).parts
-        return any(excl in parts for excl in self.exclude_dirs)
+    def _scan_into(self, dirpath: str, ext_tuple: tuple, files: list[str]) -> None:
+        """Recursively collect matching files via os.scandir.
+
+        DirEntry caches the stat result from the directory listing, and
+        excluded directories are skipped before descending into them.
+        """
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self._exclude_set:
+                            self._scan_into(entry.path, ext_tuple, files)
+                    elif entry.name.endswith(ext_tuple):
+                        files.append(_norm(entry.path))
+        except OSError:
+            # Mirror os.walk's default onerror=None: unreadable or
+            # mid-walk-deleted directories are silently skipped.
+            return
 
     def collect_files(self, path: str) -> list[str]:
         """Collect all target files under *path* respecting extension and exclude filters."""
         if os.path.isfile(path):
-            ext = os.path.splitext(path)[1]
-            return [path] if ext in self.extensions else []
+            return [_norm(path)] if path.endswith(self._ext_tuple) else []
         files: list[str] = []
-        for dirpath, dirnames, filenames in os.walk(path):
-            if self.should_exclude(dirpath):
-                dirnames.clear()  # prune walk
-                continue
-            for fname in filenames:
-                if os.path.splitext(fname)[1] in self.extensions:
-                    files.append(os.path.join(dirpath, fname))
+        self._scan_into(path, self._ext_tuple, files)
         return sorted(files)
 
 
@@ -274,9 +462,27 @@ def main():
         print("No matching files found.")
         sys.exit(0)
 
-    print(f"Processing {len(files)} file(s)...\n")
+    # Batch by directory: every file in a directory shares one rule match,
+    # so classifying each directory up front means the worker threads only
+    # ever hit the classification cache, and files from the same directory
+    # are processed together.
+    files_by_dir: dict[str, list[str]] = {}
     for file_path in files:
-        manager.add_header(file_path)
+        files_by_dir.setdefault(os.path.dirname(file_path), []).append(file_path)
+    for dirpath in files_by_dir:
+        _classify_dir(dirpath)
+
+    print(f"Processing {len(files)} file(s)...\n")
+    # add_header is dominated by file I/O (the GIL is released in the
+    # syscalls), so a thread pool gives near-linear speedup on large trees.
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(
+            pool.map(
+                manager.add_header,
+                (f for batch in files_by_dir.values() for f in batch),
+            )
+        )
 
     print(f"\nDone. Processed {len(files)} file(s).")
 